@@ -12,11 +12,25 @@ class EnhancedAssistant:
     """
     Assistente aprimorado com suporte para fallback para API externa.
     """
-    def __init__(self, api_key: Optional[str] = None, use_api: bool = False):
+    def __init__(self, api_key: Optional[str] = None, use_api: bool = False,
+                 intent_model_path: Optional[str] = None):
         # Configuração da integração com a API
         self.use_api = use_api
         self.api_assistant = ApiAssistant(api_key=api_key) if use_api else None
         
+        # Classificador de intenções treinado (opcional); sem ele, usa os padrões regex.
+        # Caminhos relativos são resolvidos a partir do diretório do backend.
+        self.intent_classifier = None
+        if intent_model_path:
+            if not os.path.isabs(intent_model_path):
+                intent_model_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), intent_model_path)
+            try:
+                # Importado só aqui para que o modo regex não dependa do NumPy
+                from .intent_classifier import IntentClassifier
+                self.intent_classifier = IntentClassifier.load(intent_model_path)
+            except Exception as e:
+                logging.warning(f"Classificador de intenções indisponível ({intent_model_path}): {str(e)}")
+        
         # Carregar respostas predefinidas
         self.responses = {
             'greeting': [
@@ -62,6 +76,18 @@ class EnhancedAssistant:
         Detecta a intenção da mensagem do usuário com nível de confiança.
         Retorna uma tupla (intent, confidence)
         """
+        if self.intent_classifier is not None:
+            return self.intent_classifier.predict(message)
+        return self.detect_intent_from_patterns(message)
+    
+    def detect_intents(self, messages: List[str]) -> List[Tuple[str, float]]:
+        """Detecta as intenções de um lote de mensagens de uma só vez."""
+        if self.intent_classifier is not None:
+            return self.intent_classifier.predict_batch(messages)
+        return [self.detect_intent_from_patterns(message) for message in messages]
+    
+    def detect_intent_from_patterns(self, message: str) -> Tuple[str, float]:
+        """Heurística baseada em regex, usada quando não há modelo treinado."""
         message = message.lower()
         
         # Pontuação básica para cada padrão encontrado
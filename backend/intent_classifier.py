@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+Classificador de intenções treinado offline.
+
+Substitui a heurística de regex do EnhancedAssistant por um modelo linear
+(regressão logística multinomial) sobre um saco de n-gramas com hashing.
+Os pesos são salvos em um único arquivo .npy, carregado com memory-map na
+inicialização, e os metadados (classes, temperatura de calibração, métricas)
+ficam em um arquivo .json ao lado.
+
+Uso:
+    python intent_classifier.py train --data data/intents.jsonl --output models/intent_model.npy
+    python intent_classifier.py evaluate --model models/intent_model.npy --data data/intents_teste.jsonl
+"""
+
+import os
+import re
+import json
+import zlib
+import argparse
+import unicodedata
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+# Intenção das mensagens fora dos temas conhecidos. Quando prevista, a confiança
+# reportada é a de a mensagem pertencer a algum tema (1 - p_default), limitada
+# ao 0.3 da heurística de regex, para que ela siga sempre para a API externa.
+FALLBACK_INTENT = 'default'
+FALLBACK_MAX_CONFIDENCE = 0.3
+
+
+def normalize_text(text: str) -> str:
+    """Converte para minúsculas e remove acentos ("orçamento" -> "orcamento")."""
+    text = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(c for c in text if not unicodedata.combining(c))
+
+
+def extract_features(text: str,
+                     word_ngrams: Tuple[int, int] = (1, 2),
+                     char_ngrams: Tuple[int, int] = (3, 5)) -> List[str]:
+    """
+    Extrai n-gramas de palavras e de caracteres (dentro das palavras).
+
+    Args:
+        text: Mensagem do usuário
+        word_ngrams: Intervalo (mín, máx) de n-gramas de palavras
+        char_ngrams: Intervalo (mín, máx) de n-gramas de caracteres
+
+    Returns:
+        List[str]: Lista de features textuais (com repetições)
+    """
+    tokens = TOKEN_PATTERN.findall(normalize_text(text))
+    features = []
+
+    for n in range(word_ngrams[0], word_ngrams[1] + 1):
+        for i in range(len(tokens) - n + 1):
+            features.append('w:' + ' '.join(tokens[i:i + n]))
+
+    for token in tokens:
+        padded = f'<{token}>'
+        for n in range(char_ngrams[0], char_ngrams[1] + 1):
+            for i in range(len(padded) - n + 1):
+                features.append('c:' + padded[i:i + n])
+
+    return features
+
+
+def _hash_feature(feature: str, n_features: int) -> Tuple[int, float]:
+    """Índice e sinal da feature; crc32 é estável entre processos, ao contrário de hash()."""
+    h = zlib.crc32(feature.encode('utf-8'))
+    return h % n_features, (1.0 if h & 0x80000000 else -1.0)
+
+
+def vectorize(texts: Sequence[str], n_features: int,
+              word_ngrams: Tuple[int, int] = (1, 2),
+              char_ngrams: Tuple[int, int] = (3, 5)) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Converte um lote de mensagens em uma matriz esparsa no formato CSR.
+
+    Cada linha é normalizada (norma L2) para que o comprimento da mensagem
+    não reduza a confiança, como acontecia na heurística antiga.
+
+    Returns:
+        Tupla (indices, values, indptr) da matriz de shape (len(texts), n_features)
+    """
+    indices: List[int] = []
+    values: List[float] = []
+    indptr = [0]
+
+    for text in texts:
+        row: Dict[int, float] = {}
+        for feature in extract_features(text, word_ngrams, char_ngrams):
+            index, sign = _hash_feature(feature, n_features)
+            row[index] = row.get(index, 0.0) + sign
+        indices.extend(row.keys())
+        values.extend(row.values())
+        indptr.append(len(indices))
+
+    indices_arr = np.asarray(indices, dtype=np.int64)
+    values_arr = np.asarray(values, dtype=np.float32)
+    indptr_arr = np.asarray(indptr, dtype=np.int64)
+
+    # Normalização L2 vetorizada por linha
+    row_ids = np.repeat(np.arange(len(texts)), np.diff(indptr_arr))
+    norms = np.sqrt(np.bincount(row_ids, weights=values_arr ** 2, minlength=len(texts)))
+    norms[norms == 0] = 1.0
+    values_arr = (values_arr / norms[row_ids]).astype(np.float32)
+
+    return indices_arr, values_arr, indptr_arr
+
+
+def _sparse_matmul(indices: np.ndarray, values: np.ndarray, indptr: np.ndarray,
+                   weights: np.ndarray) -> np.ndarray:
+    """Calcula X @ W para X esparso (CSR) e W denso de shape (n_features, n_classes)."""
+    n_rows = len(indptr) - 1
+    row_ids = np.repeat(np.arange(n_rows), np.diff(indptr))
+    contrib = np.asarray(weights[indices], dtype=np.float64) * values[:, None]
+    return np.stack([
+        np.bincount(row_ids, weights=contrib[:, c], minlength=n_rows)
+        for c in range(weights.shape[1])
+    ], axis=1)
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+def routed_confidence(probs: np.ndarray, classes: Sequence[str]) -> np.ndarray:
+    """
+    Confiança entregue ao assistente para cada linha de `probs`: a maior
+    probabilidade, exceto quando a prevista é FALLBACK_INTENT (ver acima).
+    """
+    confidence = probs.max(axis=1)
+    if FALLBACK_INTENT in classes:
+        k = list(classes).index(FALLBACK_INTENT)
+        is_fallback = probs.argmax(axis=1) == k
+        confidence = np.where(is_fallback, np.minimum(1.0 - probs[:, k], FALLBACK_MAX_CONFIDENCE), confidence)
+    return confidence
+
+
+def calibration_metrics(probs: np.ndarray, labels: np.ndarray,
+                        n_bins: int = 10, threshold: Optional[float] = None,
+                        confidence: Optional[np.ndarray] = None) -> Dict[str, float]:
+    """
+    Calcula métricas de acurácia e calibração.
+
+    Args:
+        probs: Probabilidades previstas, shape (n_amostras, n_classes)
+        labels: Índices das classes corretas
+        n_bins: Número de faixas para o erro de calibração esperado (ECE)
+        threshold: Limite de confiança; se informado, reporta a fração de
+                   mensagens que seriam enviadas à API externa
+        confidence: Confiança usada em ece, mean_confidence e below_threshold
+                    (padrão: a maior probabilidade; ver `routed_confidence`)
+
+    Returns:
+        Dict com accuracy, log_loss, brier, ece e, opcionalmente, below_threshold
+    """
+    n = len(labels)
+    if confidence is None:
+        confidence = probs.max(axis=1)
+    predicted = probs.argmax(axis=1)
+    correct = (predicted == labels).astype(np.float64)
+
+    one_hot = np.zeros_like(probs)
+    one_hot[np.arange(n), labels] = 1.0
+
+    bins = np.minimum((confidence * n_bins).astype(np.int64), n_bins - 1)
+    bin_conf = np.bincount(bins, weights=confidence, minlength=n_bins)
+    bin_acc = np.bincount(bins, weights=correct, minlength=n_bins)
+    ece = np.abs(bin_acc - bin_conf).sum() / max(1, n)
+
+    metrics = {
+        'samples': int(n),
+        'accuracy': float(correct.mean()) if n else 0.0,
+        'log_loss': float(-np.log(np.clip(probs[np.arange(n), labels], 1e-12, 1.0)).mean()) if n else 0.0,
+        'brier': float(((probs - one_hot) ** 2).sum(axis=1).mean()) if n else 0.0,
+        'ece': float(ece),
+        'mean_confidence': float(confidence.mean()) if n else 0.0,
+    }
+    if threshold is not None:
+        metrics['below_threshold'] = float((confidence < threshold).mean()) if n else 0.0
+    return metrics
+
+
+class IntentClassifier:
+    """Classificador linear de intenções com features de n-gramas via hashing."""
+
+    def __init__(self, classes: List[str], weights: np.ndarray,
+                 n_features: int = 2 ** 15,
+                 word_ngrams: Tuple[int, int] = (1, 2),
+                 char_ngrams: Tuple[int, int] = (3, 5),
+                 temperature: float = 1.0,
+                 metrics: Optional[Dict[str, Any]] = None):
+        """
+        Inicializa o classificador.
+
+        Args:
+            classes: Nomes das intenções, na ordem das colunas de `weights`
+            weights: Matriz (n_features + 1, n_classes); a última linha é o viés
+            n_features: Dimensão do espaço de hashing
+            word_ngrams: Intervalo de n-gramas de palavras
+            char_ngrams: Intervalo de n-gramas de caracteres
+            temperature: Temperatura de calibração aplicada aos logits
+            metrics: Métricas registradas no treinamento (informativas)
+        """
+        self.classes = list(classes)
+        self.weights = weights
+        self.n_features = n_features
+        self.word_ngrams = tuple(word_ngrams)
+        self.char_ngrams = tuple(char_ngrams)
+        self.temperature = temperature
+        self.metrics = metrics or {}
+
+    def _logits(self, texts: Sequence[str]) -> np.ndarray:
+        indices, values, indptr = vectorize(texts, self.n_features, self.word_ngrams, self.char_ngrams)
+        logits = _sparse_matmul(indices, values, indptr, self.weights[:self.n_features])
+        return logits + np.asarray(self.weights[self.n_features], dtype=np.float64)
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        """Retorna as probabilidades calibradas, shape (len(texts), n_classes)."""
+        return _softmax(self._logits(texts) / self.temperature)
+
+    def predict_batch(self, texts: Sequence[str]) -> List[Tuple[str, float]]:
+        """
+        Classifica um lote de mensagens, retornando pares (intent, confidence)
+        com a confiança de `routed_confidence`.
+        """
+        if not texts:
+            return []
+        probs = self.predict_proba(texts)
+        best = probs.argmax(axis=1)
+        return [(self.classes[i], float(c)) for i, c in zip(best, routed_confidence(probs, self.classes))]
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """Classifica uma única mensagem, retornando (intent, confidence)."""
+        return self.predict_batch([text])[0]
+
+    def evaluate(self, texts: Sequence[str], labels: Sequence[str],
+                 threshold: Optional[float] = None) -> Dict[str, float]:
+        """
+        Calcula acurácia e métricas de calibração em um conjunto rotulado,
+        sobre a mesma confiança que `predict_batch` entrega ao assistente.
+        """
+        known = [(t, l) for t, l in zip(texts, labels) if l in self.classes]
+        if not known:
+            return calibration_metrics(np.zeros((0, len(self.classes))), np.zeros(0, dtype=np.int64))
+        texts, labels = zip(*known)
+        y = np.array([self.classes.index(l) for l in labels], dtype=np.int64)
+        probs = self.predict_proba(texts)
+        return calibration_metrics(probs, y, threshold=threshold,
+                                   confidence=routed_confidence(probs, self.classes))
+
+    @classmethod
+    def train(cls, texts: Sequence[str], labels: Sequence[str],
+              n_features: int = 2 ** 15,
+              word_ngrams: Tuple[int, int] = (1, 2),
+              char_ngrams: Tuple[int, int] = (3, 5),
+              epochs: int = 100,
+              batch_size: int = 32,
+              learning_rate: float = 2.0,
+              l2: float = 1e-4,
+              folds: int = 5,
+              seed: int = 0) -> 'IntentClassifier':
+        """
+        Treina o classificador com gradiente descendente em mini-lotes.
+
+        A temperatura de calibração é ajustada nos logits fora da amostra de
+        uma validação cruzada com `folds` partes; o modelo final é treinado no
+        corpus completo e as métricas registradas são as da validação cruzada.
+
+        Args:
+            texts: Mensagens de treinamento
+            labels: Intenção de cada mensagem
+            epochs: Número de passagens sobre os dados
+            batch_size: Tamanho do mini-lote
+            learning_rate: Taxa de aprendizado
+            l2: Coeficiente de regularização L2
+            folds: Número de partes da validação cruzada (menos de 2 desativa)
+            seed: Semente para embaralhamento
+
+        Returns:
+            IntentClassifier: Modelo treinado
+        """
+        if len(texts) != len(labels):
+            raise ValueError("texts e labels devem ter o mesmo tamanho")
+
+        classes = sorted(set(labels))
+        y = np.array([classes.index(l) for l in labels], dtype=np.int64)
+        rng = np.random.default_rng(seed)
+        params = dict(n_features=n_features, word_ngrams=word_ngrams, char_ngrams=char_ngrams)
+        fit_params = dict(epochs=epochs, batch_size=batch_size, learning_rate=learning_rate, l2=l2)
+
+        temperature = 1.0
+        metrics: Dict[str, Any] = {}
+        folds = min(folds, len(texts))
+
+        if folds >= 2:
+            # Logits fora da amostra: cada mensagem é pontuada por um modelo que não a viu
+            logits = np.zeros((len(texts), len(classes)))
+            for valid in np.array_split(rng.permutation(len(texts)), folds):
+                train = np.setdiff1d(np.arange(len(texts)), valid)
+                weights = _fit([texts[i] for i in train], y[train], len(classes), rng, **params, **fit_params)
+                logits[valid] = cls(classes, weights, **params)._logits([texts[i] for i in valid])
+            temperature = _fit_temperature(logits, y)
+            for key, probs in (('cross_validation', _softmax(logits / temperature)),
+                               ('cross_validation_uncalibrated', _softmax(logits))):
+                metrics[key] = calibration_metrics(probs, y, confidence=routed_confidence(probs, classes))
+
+        weights = _fit(list(texts), y, len(classes), rng, **params, **fit_params)
+        return cls(classes, weights, temperature=temperature, metrics=metrics, **params)
+
+    def save(self, path: str) -> None:
+        """Salva os pesos em `path` (.npy, float32) e os metadados em `path` com extensão .json."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        np.save(path, np.asarray(self.weights, dtype=np.float32))
+        with open(_metadata_path(path), 'w', encoding='utf-8') as f:
+            json.dump({
+                'classes': self.classes,
+                'n_features': self.n_features,
+                'word_ngrams': list(self.word_ngrams),
+                'char_ngrams': list(self.char_ngrams),
+                'temperature': self.temperature,
+                'metrics': self.metrics
+            }, f, indent=2, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str) -> 'IntentClassifier':
+        """Carrega um modelo salvo; os pesos são mapeados em memória (somente leitura)."""
+        with open(_metadata_path(path), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        weights = np.load(path, mmap_mode='r')
+        return cls(
+            meta['classes'],
+            weights,
+            n_features=meta['n_features'],
+            word_ngrams=tuple(meta['word_ngrams']),
+            char_ngrams=tuple(meta['char_ngrams']),
+            temperature=meta.get('temperature', 1.0),
+            metrics=meta.get('metrics', {})
+        )
+
+
+def _metadata_path(path: str) -> str:
+    return os.path.splitext(path)[0] + '.json'
+
+
+def _fit(texts: Sequence[str], y: np.ndarray, n_classes: int, rng: np.random.Generator,
+         n_features: int, word_ngrams: Tuple[int, int], char_ngrams: Tuple[int, int],
+         epochs: int, batch_size: int, learning_rate: float, l2: float) -> np.ndarray:
+    """Ajusta a regressão logística multinomial; retorna pesos (n_features + 1, n_classes)."""
+    indices, values, indptr = vectorize(texts, n_features, word_ngrams, char_ngrams)
+    weights = np.zeros((n_features + 1, n_classes), dtype=np.float64)
+    n = len(texts)
+
+    for _ in range(epochs):
+        order = rng.permutation(n)
+        for start in range(0, n, batch_size):
+            batch = order[start:start + batch_size]
+
+            # Fatia as linhas do lote na matriz CSR
+            starts, ends = indptr[batch], indptr[batch + 1]
+            lengths = ends - starts
+            sel = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+            b_indices, b_values = indices[sel], values[sel]
+            b_indptr = np.concatenate(([0], np.cumsum(lengths)))
+
+            logits = _sparse_matmul(b_indices, b_values, b_indptr, weights[:n_features]) + weights[n_features]
+            delta = _softmax(logits)
+            delta[np.arange(len(batch)), y[batch]] -= 1.0
+            delta /= len(batch)
+
+            # Gradiente X^T @ delta, acumulado por coluna
+            row_ids = np.repeat(np.arange(len(batch)), lengths)
+            grad = np.stack([
+                np.bincount(b_indices, weights=b_values * delta[row_ids, c], minlength=n_features)
+                for c in range(n_classes)
+            ], axis=1)
+
+            weights[:n_features] -= learning_rate * (grad + l2 * weights[:n_features])
+            weights[n_features] -= learning_rate * delta.sum(axis=0)
+
+    return weights
+
+
+def _fit_temperature(logits: np.ndarray, y: np.ndarray) -> float:
+    """Escolhe a temperatura que minimiza a log-loss no conjunto de validação."""
+    candidates = np.geomspace(0.05, 5.0, 100)
+    losses = [
+        -np.log(np.clip(_softmax(logits / t)[np.arange(len(y)), y], 1e-12, 1.0)).mean()
+        for t in candidates
+    ]
+    return float(candidates[int(np.argmin(losses))])
+
+
+def load_corpus(path: str) -> Tuple[List[str], List[str]]:
+    """
+    Lê um corpus rotulado em JSON Lines, uma mensagem por linha:
+    {"text": "quanto custa um projeto?", "intent": "project"}
+    """
+    texts, labels = [], []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            texts.append(item['text'])
+            labels.append(item['intent'])
+    return texts, labels
+
+
+def main():
+    """Interface de linha de comando para treinar e avaliar o classificador"""
+    parser = argparse.ArgumentParser(description='Classificador de intenções do assistente')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    train_parser = subparsers.add_parser('train', help='Treina um novo modelo')
+    train_parser.add_argument('--data', '-d', type=str, required=True,
+                              help='Corpus rotulado em JSON Lines')
+    train_parser.add_argument('--output', '-o', type=str, default='models/intent_model.npy',
+                              help='Arquivo de pesos a ser gerado')
+    train_parser.add_argument('--n-features', type=int, default=2 ** 15,
+                              help='Dimensão do espaço de hashing')
+    train_parser.add_argument('--epochs', type=int, default=100)
+    train_parser.add_argument('--learning-rate', type=float, default=2.0)
+    train_parser.add_argument('--l2', type=float, default=1e-4)
+    train_parser.add_argument('--folds', type=int, default=5,
+                              help='Partes da validação cruzada usada para calibração')
+    train_parser.add_argument('--seed', type=int, default=0)
+
+    eval_parser = subparsers.add_parser('evaluate', help='Avalia um modelo salvo')
+    eval_parser.add_argument('--model', '-m', type=str, default='models/intent_model.npy',
+                             help='Arquivo de pesos do modelo')
+    eval_parser.add_argument('--data', '-d', type=str, required=True,
+                             help='Corpus rotulado em JSON Lines, separado do usado no treino')
+    eval_parser.add_argument('--threshold', type=float, default=0.7,
+                             help='Limite de confiança usado pelo assistente')
+
+    args = parser.parse_args()
+    texts, labels = load_corpus(args.data)
+
+    if args.command == 'train':
+        model = IntentClassifier.train(
+            texts, labels,
+            n_features=args.n_features,
+            epochs=args.epochs,
+            learning_rate=args.learning_rate,
+            l2=args.l2,
+            folds=args.folds,
+            seed=args.seed
+        )
+        model.save(args.output)
+        print(f"Modelo salvo em {args.output} ({len(model.classes)} classes, temperatura {model.temperature:.3f})")
+        print(json.dumps(model.metrics, indent=2))
+    else:
+        model = IntentClassifier.load(args.model)
+        print(json.dumps(model.evaluate(texts, labels, threshold=args.threshold), indent=2))
+
+
+if __name__ == '__main__':
+    main()
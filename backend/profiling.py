@@ -0,0 +1,363 @@
+"""
+Profiling sob demanda das requisições do chat.
+
+Um administrador liga o profiling em tempo de execução (sem redeploy) e
+escolhe quais requisições de `/api/chat` são capturadas: uma fração
+aleatória (`sample_rate`) ou as que trazem um cabeçalho específico com o
+token secreto (PROFILE_TOKEN, ou ADMIN_TOKEN se aquele não estiver definido).
+
+Modos de captura:
+    sample   - uma thread amostra a pilha de chamadas das requisições ativas
+               a cada `interval_ms` (tempo de relógio, inclui espera de rede)
+    cprofile - cada requisição é executada sob cProfile e as estatísticas
+               são acumuladas
+
+As pilhas amostradas são agregadas no formato "collapsed stack"
+(`frame1;frame2;frame3 contagem`), aceito por flamegraph.pl e speedscope.
+Quando desligado, o custo por requisição é uma única verificação booleana.
+"""
+
+import os
+import sys
+import hmac
+import time
+import random
+import marshal
+import pstats
+import cProfile
+import logging
+import threading
+from collections import Counter
+from typing import Dict, Any, Iterable, Optional
+
+from flask import Flask, Response, g, jsonify, request
+
+
+logger = logging.getLogger('assistant_backend.profiling')
+
+MODES = ('sample', 'cprofile')
+SETTINGS = ('enabled', 'mode', 'sample_rate', 'header', 'interval_ms', 'max_stacks')
+
+
+class RequestProfiler:
+    """Captura e agrega perfis de execução de requisições selecionadas."""
+
+    def __init__(self, enabled: bool = False, sample_rate: float = 0.01,
+                 header: str = 'X-Profile', mode: str = 'sample',
+                 interval_ms: float = 5.0, max_stacks: int = 5000,
+                 paths: Iterable[str] = ('/api/chat',)):
+        """
+        Inicializa o profiler.
+
+        Args:
+            enabled: Liga a captura desde o início
+            sample_rate: Fração das requisições capturadas (0 a 1)
+            header: Cabeçalho que força a captura da requisição; seu valor
+                    precisa ser igual ao token definido em `init_app`
+            mode: 'sample' (pilhas amostradas) ou 'cprofile'
+            interval_ms: Intervalo de amostragem no modo 'sample'
+            max_stacks: Limite de pilhas distintas mantidas em memória
+            paths: Rotas elegíveis para profiling
+        """
+        self.enabled = False
+        self.sample_rate = 0.0
+        self.header = header
+        self.header_token: Optional[str] = None
+        self.mode = 'sample'
+        self.interval_ms = interval_ms
+        self.max_stacks = max_stacks
+        self.paths = set(paths)
+
+        self._lock = threading.Lock()
+        self._active: Dict[int, str] = {}
+        self._stacks: Counter = Counter()
+        self._dropped_samples = 0
+        self._stats: Optional[pstats.Stats] = None
+        self._cprofile_lock = threading.Lock()
+        self._sampler: Optional[threading.Thread] = None
+        self._stop_sampler = threading.Event()
+        self._profiled_requests = 0
+        self._config_lock = threading.Lock()
+
+        self.configure(enabled=enabled, sample_rate=sample_rate, mode=mode)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'RequestProfiler':
+        """Cria o profiler a partir da seção 'profiling' do config.json."""
+        return cls(
+            enabled=config.get('enabled', False),
+            sample_rate=config.get('sample_rate', 0.01),
+            header=config.get('header', 'X-Profile'),
+            mode=config.get('mode', 'sample'),
+            interval_ms=config.get('interval_ms', 5.0),
+            max_stacks=config.get('max_stacks', 5000),
+            paths=config.get('paths', ['/api/chat'])
+        )
+
+    def configure(self, **options) -> Dict[str, Any]:
+        """
+        Atualiza a configuração em tempo de execução.
+
+        Raises:
+            ValueError: Se houver chaves desconhecidas ou valores inválidos
+        """
+        # Serializa validação, atribuição e início/parada do sampler entre requisições
+        with self._config_lock:
+            unknown = sorted(set(options) - set(SETTINGS))
+            if unknown:
+                raise ValueError(f"Opções de profiling desconhecidas: {', '.join(unknown)}")
+
+            def number(name: str, value: Any) -> float:
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    raise ValueError(f"{name} deve ser um número")
+                return float(value)
+
+            enabled = options.get('enabled', self.enabled)
+            if not isinstance(enabled, bool):
+                raise ValueError("enabled deve ser true ou false")
+            mode = options.get('mode', self.mode)
+            if mode not in MODES:
+                raise ValueError(f"Modo de profiling inválido: {mode}")
+            sample_rate = number('sample_rate', options.get('sample_rate', self.sample_rate))
+            if not 0.0 <= sample_rate <= 1.0:
+                raise ValueError("sample_rate deve estar entre 0 e 1")
+            interval_ms = number('interval_ms', options.get('interval_ms', self.interval_ms))
+            if interval_ms <= 0:
+                raise ValueError("interval_ms deve ser positivo")
+            max_stacks = number('max_stacks', options.get('max_stacks', self.max_stacks))
+            if max_stacks < 1 or max_stacks != int(max_stacks):
+                raise ValueError("max_stacks deve ser um inteiro positivo")
+            header = options.get('header', self.header)
+            if not isinstance(header, str) or not header:
+                raise ValueError("header deve ser um nome de cabeçalho")
+
+            self.mode = mode
+            self.sample_rate = sample_rate
+            self.interval_ms = interval_ms
+            self.header = header
+            self.max_stacks = int(max_stacks)
+            self.enabled = enabled
+
+            if self.enabled and self.mode == 'sample':
+                self._start_sampler()
+            else:
+                self._stop_sampler_thread()
+            return self.status()
+
+    def status(self) -> Dict[str, Any]:
+        """Retorna a configuração atual e o volume de dados coletados."""
+        return {
+            'enabled': self.enabled,
+            'mode': self.mode,
+            'sample_rate': self.sample_rate,
+            'header': self.header,
+            'interval_ms': self.interval_ms,
+            'max_stacks': self.max_stacks,
+            'paths': sorted(self.paths),
+            'profiled_requests': self._profiled_requests,
+            'distinct_stacks': len(self._stacks),
+            'samples': sum(self._stacks.values()),
+            'dropped_samples': self._dropped_samples,
+            'has_cprofile_stats': self._stats is not None
+        }
+
+    def reset(self) -> None:
+        """Descarta os dados coletados."""
+        with self._lock:
+            self._stacks.clear()
+            self._dropped_samples = 0
+            self._stats = None
+            self._profiled_requests = 0
+
+    # Seleção e captura das requisições
+
+    def should_profile(self, path: str, headers) -> bool:
+        """Decide se a requisição atual deve ser capturada."""
+        if path not in self.paths:
+            return False
+        provided = headers.get(self.header) if self.header_token else None
+        if provided and hmac.compare_digest(provided.encode('utf-8'), self.header_token.encode('utf-8')):
+            return True
+        return random.random() < self.sample_rate
+
+    def start(self, label: str) -> Optional[Any]:
+        """Inicia a captura na thread atual; retorna um token para `stop`."""
+        if self.mode == 'cprofile':
+            # Só um cProfile pode estar ativo por vez no interpretador
+            if not self._cprofile_lock.acquire(blocking=False):
+                return None
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                self._cprofile_lock.release()
+                return None
+            return profile
+
+        thread_id = threading.get_ident()
+        with self._lock:
+            self._active[thread_id] = label
+        return thread_id
+
+    def stop(self, token: Any) -> None:
+        """Encerra a captura iniciada por `start` e agrega o resultado."""
+        if isinstance(token, cProfile.Profile):
+            token.disable()
+            self._cprofile_lock.release()
+            with self._lock:
+                if self._stats is None:
+                    self._stats = pstats.Stats(token)
+                else:
+                    self._stats.add(token)
+                self._profiled_requests += 1
+            return
+
+        with self._lock:
+            if self._active.pop(token, None) is not None:
+                self._profiled_requests += 1
+
+    def _start_sampler(self) -> None:
+        if self._sampler is not None and self._sampler.is_alive():
+            return
+        self._stop_sampler = threading.Event()
+        self._sampler = threading.Thread(
+            target=self._sample_loop, args=(self._stop_sampler,),
+            name='request-profiler', daemon=True
+        )
+        self._sampler.start()
+
+    def _stop_sampler_thread(self) -> None:
+        self._stop_sampler.set()
+        self._sampler = None
+        with self._lock:
+            self._active.clear()
+
+    def _sample_loop(self, stop: threading.Event) -> None:
+        """Amostra periodicamente as pilhas das threads com requisições ativas."""
+        while not stop.wait(self.interval_ms / 1000.0):
+            with self._lock:
+                if not self._active:
+                    continue
+                active = dict(self._active)
+            frames = sys._current_frames()
+            for thread_id, label in active.items():
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    self._record(label, frame)
+
+    def _record(self, label: str, frame) -> None:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            qualname = getattr(code, 'co_qualname', code.co_name)
+            name = f"{qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            stack.append(name.replace(';', ':'))
+            frame = frame.f_back
+        stack.append(label)
+        key = ';'.join(reversed(stack))
+
+        with self._lock:
+            if key in self._stacks or len(self._stacks) < self.max_stacks:
+                self._stacks[key] += 1
+            else:
+                self._dropped_samples += 1
+
+    # Exportação
+
+    def collapsed_stacks(self) -> str:
+        """Retorna as pilhas agregadas no formato collapsed (flamegraph)."""
+        with self._lock:
+            items = sorted(self._stacks.items())
+        return ''.join(f"{stack} {count}\n" for stack, count in items)
+
+    def cprofile_dump(self) -> Optional[bytes]:
+        """Retorna as estatísticas do cProfile no formato lido por pstats/snakeviz."""
+        with self._lock:
+            if self._stats is None:
+                return None
+            return marshal.dumps(self._stats.stats)
+
+    # Integração com Flask
+
+    def init_app(self, app: Flask, admin_token: Optional[str] = None,
+                 profile_token: Optional[str] = None) -> None:
+        """
+        Registra os hooks de requisição e as rotas de administração.
+
+        As rotas de administração só respondem quando `admin_token` (ou a
+        variável de ambiente ADMIN_TOKEN) está definido, e exigem o mesmo
+        valor no cabeçalho X-Admin-Token. O cabeçalho de captura só tem efeito
+        com o valor de `profile_token` (ou PROFILE_TOKEN, ou o token de
+        administração); sem nenhum deles, vale apenas a amostragem aleatória.
+        """
+        admin_token = admin_token or os.environ.get('ADMIN_TOKEN')
+        self.header_token = profile_token or os.environ.get('PROFILE_TOKEN') or admin_token
+        app.config['profiler'] = self
+
+        @app.before_request
+        def start_profiling():
+            if not self.enabled:
+                return
+            if self.should_profile(request.path, request.headers):
+                g.profiling_token = self.start(f"{request.method} {request.path}")
+                g.profiling_start = time.perf_counter()
+
+        @app.after_request
+        def mark_profiled(response):
+            if g.get('profiling_token') is not None:
+                elapsed = (time.perf_counter() - g.profiling_start) * 1000
+                response.headers['X-Profiled'] = f"{self.mode}; dur={elapsed:.1f}"
+            return response
+
+        @app.teardown_request
+        def stop_profiling(exc):
+            token = g.pop('profiling_token', None)
+            if token is not None:
+                self.stop(token)
+
+        def authorized() -> bool:
+            provided = request.headers.get('X-Admin-Token', '')
+            return bool(admin_token) and hmac.compare_digest(provided.encode('utf-8'), admin_token.encode('utf-8'))
+
+        @app.route('/api/admin/profiling', methods=['GET', 'POST'])
+        def profiling_config():
+            if not authorized():
+                return jsonify({'error': 'Não autorizado'}), 403
+            if request.method == 'GET':
+                return jsonify(self.status())
+            try:
+                status = self.configure(**(request.json or {}))
+            except (TypeError, ValueError) as e:
+                return jsonify({'error': str(e)}), 400
+            logger.info(f"Profiling atualizado: {status}")
+            return jsonify(status)
+
+        @app.route('/api/admin/profiling/flamegraph', methods=['GET'])
+        def profiling_flamegraph():
+            if not authorized():
+                return jsonify({'error': 'Não autorizado'}), 403
+            return Response(
+                self.collapsed_stacks(),
+                mimetype='text/plain',
+                headers={'Content-Disposition': 'attachment; filename=chat.collapsed'}
+            )
+
+        @app.route('/api/admin/profiling/pstats', methods=['GET'])
+        def profiling_pstats():
+            if not authorized():
+                return jsonify({'error': 'Não autorizado'}), 403
+            data = self.cprofile_dump()
+            if data is None:
+                return jsonify({'error': 'Nenhuma estatística do cProfile coletada'}), 404
+            return Response(
+                data,
+                mimetype='application/octet-stream',
+                headers={'Content-Disposition': 'attachment; filename=chat.prof'}
+            )
+
+        @app.route('/api/admin/profiling/reset', methods=['POST'])
+        def profiling_reset():
+            if not authorized():
+                return jsonify({'error': 'Não autorizado'}), 403
+            self.reset()
+            return jsonify(self.status())
@@ -15,6 +15,7 @@ from flask_cors import CORS
 from assistant import Assistant
 from enhanced_assistant import EnhancedAssistant
 from model_integration import create_model_manager_from_config
+from profiling import RequestProfiler
 
 # Configuração de logging
 logging.basicConfig(
@@ -70,7 +71,12 @@ def create_app(config):
         # Inicializa o assistente com suporte à API externa
         api_key = os.environ.get('API_KEY')
         logger.info("Inicializando assistente aprimorado com suporte à API...")
-        assistant = EnhancedAssistant(api_key=api_key, use_api=True)
+        assistant = EnhancedAssistant(
+            api_key=api_key,
+            use_api=True,
+            intent_model_path=assistant_config.get('intent_model')
+        )
+        assistant.confidence_threshold = assistant_config.get('confidence_threshold', 0.7)
     else:
         # Inicializa o assistente básico
         logger.info("Inicializando assistente básico...")
@@ -79,6 +85,10 @@ def create_app(config):
     # Registra o assistente na aplicação
     app.config['assistant'] = assistant
     
+    # Profiling sob demanda (desligado por padrão, ativado via /api/admin/profiling)
+    profiler = RequestProfiler.from_config(config.get('profiling', {}))
+    profiler.init_app(app)
+    
     # Rotas da API
     @app.route('/api/chat', methods=['POST'])
     def chat():
@@ -0,0 +1,673 @@
+#!/usr/bin/env python3
+"""
+Build de produção do site.
+
+Gera em `dist/` uma única página com os componentes de `components/` já
+embutidos, CSS e JS agrupados e minificados com nomes versionados por hash
+(cache longo), imagens re-codificadas em WebP/AVIF com `srcset` e cópias
+pré-comprimidas `.gz` e `.br` dos arquivos de texto. Ao final imprime um
+relatório com a economia de bytes.
+
+Dependências opcionais:
+    Pillow  - re-codificação e redimensionamento das imagens
+    brotli  - geração dos arquivos .br
+
+Uso:
+    python build.py
+    python build.py --output dist --widths 480 960 1600
+"""
+
+import re
+import sys
+import gzip
+import shutil
+import hashlib
+import argparse
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+ROOT = Path(__file__).resolve().parent
+
+# Mesmo mapeamento usado por js/component-loader.js (container -> componente)
+COMPONENTS = {
+    'header-container': 'header.html',
+    'hero-container': 'hero-section.html',
+    'about-container': 'about-section.html',
+    'stats-container': 'stats-section.html',
+    'skills-container': 'skills-section.html',
+    'projects-container': 'project-section.html',
+    'testimonials-container': 'testimonials-section.html',
+    'economy-container': 'economy-simulator-section.html',
+    'contact-container': 'contact-section.html',
+    'creative-modal-container': 'creative-modal.html',
+    'footer-container': 'footer.html',
+    'clippy-container': 'clippy-assistant.html',
+    'ai-assistant-container': 'ai-assistant.html',
+}
+
+# Com os componentes embutidos o carregador não é mais necessário;
+# sem ele, main.js inicializa os módulos diretamente.
+SKIPPED_SCRIPTS = {'js/component-loader.js'}
+
+# Módulos exigidos por componentes embutidos que o index.html não carrega;
+# entram no bundle antes de main.js, que chama o init() de cada um
+COMPONENT_SCRIPTS = {
+    'ai-assistant-container': 'js/modules/ai-assistant.js',
+}
+
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.webp'}
+TEXT_EXTENSIONS = {'.html', '.css', '.js', '.svg', '.json'}
+DEFAULT_WIDTHS = (480, 960, 1600)
+
+# Valor de `sizes` por imagem, casado contra a tag <img>; espelha as larguras do CSS
+IMAGE_SIZES = [
+    # .profile-shape: 380px, reduzido em responsive.css a 300/250/200px
+    (re.compile(r'class=["\'][^"\']*\bprofile-image\b'),
+     '(max-width: 576px) 200px, (max-width: 768px) 250px, (max-width: 992px) 300px, 380px'),
+    # .project-gallery-grid: minmax(280px, 1fr) em .container (90%, máx. 1200px) -> 1, 2 ou 3 colunas
+    (re.compile(r'src=["\']images/projects/'),
+     '(max-width: 640px) 90vw, (max-width: 960px) 45vw, (max-width: 1333px) 30vw, 380px'),
+]
+DEFAULT_SIZES = '100vw'
+
+# Arquivo gravado no diretório de saída; só diretórios com ele são apagados
+BUILD_MARKER = '.build-output'
+
+CSS_STRING = r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\''
+# Strings entram na alternativa para que `/* */` dentro delas não seja removido
+CSS_COMMENT = re.compile(r'(%s)|/\*.*?\*/' % CSS_STRING, re.S)
+CSS_IMPORT = re.compile(r'@import\s+(?:url\(\s*)?([\'"]?)([^\'")\s;]+)\1\s*\)?\s*([^;]*);')
+CSS_URL = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+HTML_STYLESHEET = re.compile(r'<link\b[^>]*\brel=["\']stylesheet["\'][^>]*>', re.I)
+HTML_SCRIPT = re.compile(r'<script\b([^>]*)>(.*?)</script>', re.I | re.S)
+HTML_STYLE = re.compile(r'(<style\b[^>]*>)(.*?)(</style>)', re.I | re.S)
+HTML_IMG = re.compile(r'<img\b[^>]*>', re.I)
+HTML_COMMENT = re.compile(r'<!--(?!\[if).*?-->', re.S)
+HTML_PRESERVE = re.compile(r'<(pre|textarea|script|style)\b.*?</\1>', re.I | re.S)
+
+
+def _attr(tag: str, name: str) -> Optional[str]:
+    """Retorna o valor de um atributo de uma tag HTML (ou None)."""
+    match = re.search(r'\b%s\s*=\s*(["\'])(.*?)\1' % name, tag, re.I | re.S)
+    return match.group(2) if match else None
+
+
+def _is_external(url: str) -> bool:
+    return bool(re.match(r'^([a-z]+:|//|#)', url, re.I))
+
+
+def _strip_css_comments(css: str) -> str:
+    return CSS_COMMENT.sub(lambda m: m.group(1) or '', css)
+
+
+def minify_css(css: str) -> str:
+    """Remove comentários e espaços desnecessários, preservando strings."""
+    parts = re.split(r'(%s)' % CSS_STRING, _strip_css_comments(css))
+    for i in range(0, len(parts), 2):
+        chunk = re.sub(r'\s+', ' ', parts[i])
+        chunk = re.sub(r'\s*([{};,>])\s*', r'\1', chunk)
+        chunk = re.sub(r':\s+', ':', chunk)
+        parts[i] = chunk.replace(';}', '}')
+    return ''.join(parts).strip()
+
+
+# Após estes caracteres uma barra inicia uma expressão regular, não uma divisão
+_JS_REGEX_PREFIX = set('(,=:[!&|?{};+-*%<>~^')
+_JS_REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new',
+                      'delete', 'void', 'throw', 'yield', 'await'}
+# Espaços ao redor destes caracteres podem ser removidos com segurança
+_JS_PUNCTUATION = set('{}()[];,:=?&|<>!*%^~')
+
+
+def minify_js(js: str) -> str:
+    """
+    Minificação conservadora: remove comentários, indentação e espaços ao
+    redor de pontuação, mantendo quebras de linha onde a inserção automática
+    de ponto e vírgula poderia depender delas.
+    """
+    out: List[str] = []
+    i, n = 0, len(js)
+
+    def last_significant() -> str:
+        for chunk in reversed(out):
+            stripped = chunk.rstrip()
+            if stripped:
+                return stripped
+        return ''
+
+    def skip_string(start: int) -> int:
+        quote, j = js[start], start + 1
+        while j < n and js[j] != quote:
+            j += 2 if js[j] == '\\' else 1
+        return j + 1
+
+    def skip_template(start: int) -> int:
+        j, depth = start + 1, 0
+        while j < n:
+            c = js[j]
+            if c == '\\':
+                j += 2
+                continue
+            if depth == 0:
+                if c == '`':
+                    return j + 1
+                if js.startswith('${', j):
+                    depth, j = 1, j + 2
+                    continue
+            else:
+                if c in '\'"':
+                    j = skip_string(j)
+                    continue
+                if c == '`':
+                    j = skip_template(j)
+                    continue
+                if c == '{':
+                    depth += 1
+                elif c == '}':
+                    depth -= 1
+            j += 1
+        return j
+
+    def skip_regex(start: int) -> int:
+        j, in_class = start + 1, False
+        while j < n and js[j] != '\n':
+            c = js[j]
+            if c == '\\':
+                j += 2
+                continue
+            if c == '[':
+                in_class = True
+            elif c == ']':
+                in_class = False
+            elif c == '/' and not in_class:
+                j += 1
+                while j < n and (js[j].isalnum() or js[j] == '_'):
+                    j += 1
+                return j
+            j += 1
+        return j
+
+    while i < n:
+        c = js[i]
+        if c in '\'"':
+            end = skip_string(i)
+            out.append(js[i:end])
+            i = end
+        elif c == '`':
+            end = skip_template(i)
+            out.append(js[i:end])
+            i = end
+        elif js.startswith('//', i):
+            end = js.find('\n', i)
+            i = n if end == -1 else end
+        elif js.startswith('/*', i):
+            end = js.find('*/', i + 2)
+            end = n if end == -1 else end + 2
+            if js.startswith('/*!', i):
+                out.append(js[i:end] + '\n')
+            else:
+                out.append('\n' if '\n' in js[i:end] else ' ')
+            i = end
+        elif c == '/':
+            prev = last_significant()
+            word = re.search(r'[A-Za-z_$][\w$]*$', prev)
+            if not prev or prev[-1] in _JS_REGEX_PREFIX or (word and word.group(0) in _JS_REGEX_KEYWORDS):
+                end = skip_regex(i)
+                out.append(js[i:end])
+                i = end
+            else:
+                out.append(c)
+                i += 1
+        elif c.isspace():
+            end = i
+            while end < n and js[end].isspace():
+                end += 1
+            out.append('\n' if '\n' in js[i:end] else ' ')
+            i = end
+        else:
+            end = i
+            while end < n and js[end] not in '\'"`/' and not js[end].isspace():
+                end += 1
+            out.append(js[i:end])
+            i = max(end, i + 1)
+
+    # Junta os fragmentos, removendo espaços e quebras de linha redundantes
+    result: List[str] = []
+    for k, chunk in enumerate(out):
+        if chunk not in (' ', '\n'):
+            result.append(chunk)
+            continue
+        prev = result[-1][-1:] if result else ''
+        nxt = next((o[:1] for o in out[k + 1:] if o not in (' ', '\n')), '')
+        if not prev or not nxt or prev in ' \n':
+            continue
+        if chunk == '\n':
+            if prev in '{;,([' or nxt in '});,]':
+                continue
+            result.append('\n')
+        elif (prev in _JS_PUNCTUATION or nxt in _JS_PUNCTUATION) and not (prev in '+-' and nxt in '+-'):
+            continue
+        else:
+            result.append(' ')
+    return ''.join(result).strip() + '\n'
+
+
+def minify_html(html: str) -> str:
+    """Remove comentários e colapsa espaços, preservando pre/textarea/script/style."""
+    preserved: List[str] = []
+
+    def protect(match):
+        preserved.append(match.group(0))
+        return f'\x00{len(preserved) - 1}\x00'
+
+    html = HTML_PRESERVE.sub(protect, html)
+    html = HTML_COMMENT.sub('', html)
+    html = re.sub(r'\s+', ' ', html)
+    html = re.sub(r'>\s+<', '> <', html)
+    return re.sub(r'\x00(\d+)\x00', lambda m: preserved[int(m.group(1))], html).strip()
+
+
+class SiteBuilder:
+    """Monta a versão otimizada do site a partir dos fontes do repositório."""
+
+    def __init__(self, root: Path, output: Path, widths: Tuple[int, ...] = DEFAULT_WIDTHS):
+        """
+        Inicializa o builder.
+
+        Args:
+            root: Diretório raiz do site (onde está o index.html)
+            output: Diretório de saída do build
+            widths: Larguras (px) geradas para o srcset das imagens
+
+        Raises:
+            ValueError: Se alguma largura não for positiva
+        """
+        if not widths or any(width <= 0 for width in widths):
+            raise ValueError(f"Larguras inválidas: {list(widths)} (use inteiros positivos)")
+        self.root = root
+        self.output = output
+        self.assets = output / 'assets'
+        self.widths = tuple(sorted(set(widths)))
+        self.images: Dict[Path, Dict[str, object]] = {}
+        self.emitted: Dict[Path, str] = {}
+        self.sources: Dict[Path, str] = {}
+        self.outputs: List[Tuple[str, Path]] = []
+        self.use_avif = Image is not None
+        self.warnings: List[str] = []
+        self.component_scripts: List[str] = []
+
+    def warn(self, message: str) -> None:
+        self.warnings.append(message)
+        print(f"AVISO: {message}", file=sys.stderr)
+
+    def _read_source(self, path: Path, category: str) -> str:
+        self.sources[path] = category
+        return path.read_text(encoding='utf-8')
+
+    def _emit(self, name: str, data: bytes, category: Optional[str]) -> str:
+        """
+        Grava um asset com hash no nome e retorna a URL relativa à raiz do build.
+        Assets sem categoria não entram no relatório (ex.: variantes de imagem).
+        """
+        stem, ext = Path(name).stem, Path(name).suffix.lower()
+        slug = re.sub(r'[^a-z0-9]+', '-', stem.lower()).strip('-') or 'asset'
+        digest = hashlib.sha256(data).hexdigest()[:10]
+        target = self.assets / f'{slug}.{digest}{ext}'
+        target.write_bytes(data)
+        if category:
+            self.outputs.append((category, target))
+        return f'assets/{target.name}'
+
+    def _check_output(self) -> None:
+        """
+        Garante que o diretório de saída pode ser apagado com segurança.
+
+        Dentro do repositório só `dist/` é aceito, para nunca apagar fontes
+        (css/, images/, components/...). Um diretório existente só é apagado
+        se estiver vazio ou tiver sido criado por um build anterior.
+
+        Raises:
+            ValueError: Se o diretório de saída for inválido
+        """
+        root, output = self.root.resolve(), self.output.resolve()
+        dist = root / 'dist'
+        if output in (root, *root.parents) or (root in output.parents and output != dist):
+            raise ValueError(f"Diretório de saída inválido: {self.output} (use dist/ ou um diretório fora do repositório)")
+        if output.exists() and any(output.iterdir()) and not (output / BUILD_MARKER).exists():
+            raise ValueError(f"{self.output} não está vazio e não foi gerado por build.py; não será apagado")
+
+    def build(self) -> None:
+        """Executa todas as etapas do build."""
+        self._check_output()
+        if self.output.exists():
+            shutil.rmtree(self.output)
+        self.assets.mkdir(parents=True)
+        (self.output / BUILD_MARKER).write_text('Gerado por build.py; apagado a cada build.\n', encoding='utf-8')
+
+        html = self._read_source(self.root / 'index.html', 'html')
+        html = self.inline_components(html)
+        html = self.bundle_stylesheets(html)
+        html = self.bundle_scripts(html)
+        html = HTML_STYLE.sub(lambda m: m.group(1) + self.rewrite_css_urls(minify_css(m.group(2)), self.root, '') + m.group(3), html)
+        html = HTML_IMG.sub(self.rewrite_img, html)
+        html = re.sub(r'style=(["\'])(.*?)\1', lambda m: 'style=%s%s%s' % (m.group(1), self.rewrite_css_urls(m.group(2), self.root, ''), m.group(1)), html)
+        html = minify_html(html)
+
+        index = self.output / 'index.html'
+        index.write_text(html, encoding='utf-8')
+        self.outputs.append(('html', index))
+        self.precompress()
+
+    def inline_components(self, html: str) -> str:
+        """Substitui os containers vazios pelo conteúdo dos componentes."""
+        def replace(match):
+            container_id = match.group(1)
+            path = self.root / 'components' / COMPONENTS[container_id]
+            if not path.exists():
+                self.warn(f"Componente não encontrado: {path.relative_to(self.root)}")
+                return match.group(0)
+            if container_id in COMPONENT_SCRIPTS:
+                self.component_scripts.append(COMPONENT_SCRIPTS[container_id])
+            return f'<div id="{container_id}">{self._read_source(path, "html")}</div>'
+
+        pattern = r'<div id="(%s)">\s*</div>' % '|'.join(map(re.escape, COMPONENTS))
+        return re.sub(pattern, replace, html)
+
+    def bundle_css(self, path: Path, seen: set, external: List[str]) -> str:
+        """Resolve recursivamente os @import locais de uma folha de estilos."""
+        path = path.resolve()
+        if path in seen:
+            return ''
+        seen.add(path)
+        if not path.exists():
+            self.warn(f"CSS não encontrado: {path.relative_to(self.root)}")
+            return ''
+
+        css = _strip_css_comments(self._read_source(path, 'css'))
+
+        def replace_import(match):
+            url, media = match.group(2), match.group(3).strip()
+            if _is_external(url):
+                external.append(match.group(0))
+                return ''
+            content = self.bundle_css(path.parent / url, seen, external)
+            return f'@media {media}{{{content}}}' if media and content else content
+
+        css = CSS_IMPORT.sub(replace_import, css)
+        return self.rewrite_css_urls(css, path.parent, 'assets/')
+
+    def rewrite_css_urls(self, css: str, base: Path, strip_prefix: str) -> str:
+        """Aponta url() locais para os assets gerados (imagens viram WebP)."""
+        def replace(match):
+            url = match.group(2).strip()
+            if _is_external(url) or url.startswith('data:'):
+                return match.group(0)
+            path = (base / url.split('?')[0].split('#')[0]).resolve()
+            if not path.is_file():
+                return match.group(0)
+            if path.suffix.lower() in IMAGE_EXTENSIONS:
+                image = self.optimize_image(path)
+                variants = image['webp'] or [(image['fallback'], 0)]
+                target = variants[-1][0]
+            else:
+                target = self.copy_asset(path)
+            return f'url("{target[len(strip_prefix):] if target.startswith(strip_prefix) else target}")'
+
+        return CSS_URL.sub(replace, css)
+
+    def bundle_stylesheets(self, html: str) -> str:
+        """
+        Agrupa as folhas de estilo locais em um único arquivo minificado.
+
+        O arquivo entra no lugar do último `<link>` local e cada folha repetida
+        fica só na sua última ocorrência, que é a que vale na cascata original.
+        """
+        links = [m for m in HTML_STYLESHEET.finditer(html) if not _is_external(_attr(m.group(0), 'href') or '')]
+        if not links:
+            return html
+
+        seen: set = set()
+        external: List[str] = []
+        chunks = [self.bundle_css(self.root / _attr(m.group(0), 'href'), seen, external) for m in reversed(links)]
+        css = ''.join(reversed(chunks))
+        url = self._emit('styles.css', minify_css(''.join(reversed(external)) + css).encode('utf-8'), 'css')
+
+        last = links[-1]
+        html = html[:last.start()] + f'<link rel="stylesheet" href="{url}">' + html[last.end():]
+        for match in reversed(links[:-1]):
+            html = html[:match.start()] + html[match.end():]
+        return html
+
+    def bundle_scripts(self, html: str) -> str:
+        """
+        Agrupa scripts locais consecutivos em arquivos únicos minificados.
+        Scripts externos entre eles interrompem o grupo para manter a ordem de execução.
+        """
+        groups: List[List[re.Match]] = []
+        for match in HTML_SCRIPT.finditer(html):
+            src = _attr(match.group(1), 'src')
+            if not src or _is_external(src):
+                continue
+            between = HTML_COMMENT.sub('', html[groups[-1][-1].end():match.start()]) if groups else None
+            if between is not None and not between.strip():
+                groups[-1].append(match)
+            else:
+                groups.append([match])
+
+        # Os módulos dos componentes entram no grupo de main.js (ou no último grupo)
+        main_group = next((k for k, group in enumerate(groups)
+                           if any(_attr(m.group(1), 'src') == 'js/main.js' for m in group)), len(groups) - 1)
+
+        for number, group in reversed(list(enumerate(groups))):
+            srcs = [_attr(match.group(1), 'src') for match in group]
+            if number == main_group:
+                position = srcs.index('js/main.js') if 'js/main.js' in srcs else len(srcs)
+                srcs[position:position] = [src for src in self.component_scripts if src not in srcs]
+
+            sources = []
+            for src in srcs:
+                path = self.root / src
+                if src in SKIPPED_SCRIPTS:
+                    continue
+                if not path.exists():
+                    self.warn(f"Script não encontrado: {src}")
+                    continue
+                sources.append(minify_js(self._read_source(path, 'js')))
+            tag = ''
+            if sources:
+                url = self._emit(f'app-{number}.js' if number else 'app.js', ';\n'.join(sources).encode('utf-8'), 'js')
+                tag = f'<script src="{url}"></script>'
+            html = html[:group[0].start()] + tag + html[group[-1].end():]
+
+        # Scripts inline dos componentes
+        def minify_inline(match):
+            script_type = (_attr(match.group(1), 'type') or 'text/javascript').lower()
+            if _attr(match.group(1), 'src') or not match.group(2).strip() or 'javascript' not in script_type:
+                return match.group(0)
+            return f'<script{match.group(1)}>{minify_js(match.group(2)).strip()}</script>'
+
+        return HTML_SCRIPT.sub(minify_inline, html)
+
+    def copy_asset(self, path: Path) -> str:
+        """Copia um arquivo para o build com hash no nome."""
+        if path not in self.emitted:
+            category = 'images' if path.suffix.lower() in IMAGE_EXTENSIONS else 'other'
+            self.sources[path] = category
+            self.emitted[path] = self._emit(path.name, path.read_bytes(), category)
+        return self.emitted[path]
+
+    def optimize_image(self, path: Path) -> Dict[str, object]:
+        """
+        Gera versões redimensionadas em WebP e AVIF e uma versão de fallback
+        no formato original, limitada à maior largura configurada.
+
+        Returns:
+            Dict com 'fallback' (URL), 'width'/'height' do fallback (ou None)
+            e listas 'webp'/'avif' de (URL, largura)
+        """
+        if path in self.images:
+            return self.images[path]
+
+        result: Dict[str, object] = {'fallback': None, 'width': None, 'height': None, 'webp': [], 'avif': []}
+        self.images[path] = result
+        if Image is None:
+            result['fallback'] = self.copy_asset(path)
+            return result
+
+        self.sources[path] = 'images'
+        original = path.read_bytes()
+        with Image.open(BytesIO(original)) as source:
+            image = ImageOps.exif_transpose(source)
+            image.load()
+
+        max_width = min(image.width, self.widths[-1])
+        widths = [w for w in self.widths if w < max_width] + [max_width]
+        has_alpha = image.mode in ('RGBA', 'LA', 'P')
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+
+        def encode(img, fmt: str, **options) -> bytes:
+            buffer = BytesIO()
+            img.save(buffer, fmt, **options)
+            return buffer.getvalue()
+
+        for width in widths:
+            resized = image if width == image.width else image.resize(
+                (width, round(image.height * width / image.width)), Image.LANCZOS)
+            suffix = f'{path.stem}-{width}w'
+            webp = encode(resized, 'WEBP', quality=80, method=6)
+            result['webp'].append((self._emit(suffix + '.webp', webp, None), width))
+            if self.use_avif:
+                try:
+                    avif = encode(resized, 'AVIF', quality=60, speed=6)
+                    result['avif'].append((self._emit(suffix + '.avif', avif, None), width))
+                except (KeyError, OSError, ValueError):
+                    self.use_avif = False
+                    self.warn("Pillow sem suporte a AVIF; gerando apenas WebP")
+
+        largest = image if max_width == image.width else image.resize(
+            (max_width, round(image.height * max_width / image.width)), Image.LANCZOS)
+        if path.suffix.lower() in ('.jpg', '.jpeg'):
+            fallback = encode(largest.convert('RGB'), 'JPEG', quality=85, optimize=True, progressive=True)
+        elif path.suffix.lower() == '.png':
+            fallback = encode(largest, 'PNG', optimize=True)
+        else:
+            fallback = original
+        if len(fallback) >= len(original):
+            fallback, largest = original, image
+        result['fallback'] = self._emit(path.name, fallback, None)
+        result['width'], result['height'] = largest.width, largest.height
+
+        # No relatório conta apenas o arquivo que um navegador atual baixaria
+        # (a menor versão na maior largura), não todas as variantes geradas
+        largest_urls = [result[fmt][-1][0] for fmt in ('avif', 'webp') if result[fmt]] + [result['fallback']]
+        served = min((self.output / url for url in largest_urls), key=lambda p: p.stat().st_size)
+        self.outputs.append(('images', served))
+        return result
+
+    def rewrite_img(self, match) -> str:
+        """Troca uma <img> local por <picture> com fontes AVIF/WebP e srcset."""
+        tag = match.group(0)
+        src = _attr(tag, 'src')
+        if not src or _is_external(src) or src.startswith('data:'):
+            return tag
+        path = self.root / src
+        if not path.is_file() or path.suffix.lower() not in IMAGE_EXTENSIONS:
+            self.warn(f"Imagem não encontrada: {src}")
+            return tag
+
+        image = self.optimize_image(path)
+        sizes = _attr(tag, 'sizes') or next(
+            (value for pattern, value in IMAGE_SIZES if pattern.search(tag)), DEFAULT_SIZES)
+        tag = re.sub(r'\bsrc\s*=\s*(["\']).*?\1', f'src="{image["fallback"]}"', tag, count=1, flags=re.I | re.S)
+        # Dimensões intrínsecas evitam layout shift; o CSS (height: auto) mantém a proporção
+        if image['width'] and not re.search(r'\b(width|height)\s*=', tag, re.I):
+            tag = tag[:-1].rstrip('/ ') + f' width="{image["width"]}" height="{image["height"]}">'
+        sources = ''.join(
+            f'<source type="image/{fmt}" srcset="{", ".join(f"{url} {w}w" for url, w in image[fmt])}" sizes="{sizes}">'
+            for fmt in ('avif', 'webp') if image[fmt]
+        )
+        return f'<picture>{sources}{tag}</picture>' if sources else tag
+
+    def precompress(self) -> None:
+        """Gera arquivos .gz e .br para os assets de texto."""
+        if brotli is None:
+            self.warn("Módulo brotli não instalado; arquivos .br não serão gerados")
+        for category, path in list(self.outputs):
+            if path.suffix not in TEXT_EXTENSIONS:
+                continue
+            data = path.read_bytes()
+            gz = gzip.compress(data, compresslevel=9, mtime=0)
+            if len(gz) < len(data):
+                path.with_name(path.name + '.gz').write_bytes(gz)
+            if brotli is not None:
+                br = brotli.compress(data, quality=11)
+                if len(br) < len(data):
+                    path.with_name(path.name + '.br').write_bytes(br)
+
+    def report(self) -> str:
+        """Monta o relatório de bytes por categoria (fonte, build e transferência)."""
+        rows: Dict[str, List[int]] = {}
+        for path, category in self.sources.items():
+            rows.setdefault(category, [0, 0, 0, 0])[0] += path.stat().st_size
+        for category, path in self.outputs:
+            row = rows.setdefault(category, [0, 0, 0, 0])
+            size = path.stat().st_size
+            row[1] += size
+            gz, br = path.with_name(path.name + '.gz'), path.with_name(path.name + '.br')
+            row[2] += gz.stat().st_size if gz.exists() else size
+            row[3] += br.stat().st_size if br.exists() else size
+
+        lines = [f"{'Categoria':<10}{'Fonte':>12}{'Build':>12}{'gzip':>12}{'brotli':>12}{'Economia':>10}"]
+        totals = [0, 0, 0, 0]
+        for category, row in sorted(rows.items()):
+            totals = [t + v for t, v in zip(totals, row)]
+            lines.append(self._report_line(category, row))
+        lines.append(self._report_line('total', totals))
+
+        files = [p for p in self.output.rglob('*') if p.is_file()]
+        lines.append(f"{len(files)} arquivos gerados ({sum(p.stat().st_size for p in files):,} bytes em disco, "
+                     f"incluindo variantes de imagem e arquivos pré-comprimidos)")
+        return '\n'.join(lines)
+
+    @staticmethod
+    def _report_line(label: str, row: List[int]) -> str:
+        best = min(row[1:]) if row[1] else 0
+        saving = f'{100 * (1 - best / row[0]):.1f}%' if row[0] else '-'
+        return f"{label:<10}" + ''.join(f'{v:>12,}' for v in row) + f'{saving:>10}'
+
+
+def main():
+    """Função principal do build"""
+    parser = argparse.ArgumentParser(description='Build de produção do site')
+    parser.add_argument('--output', '-o', type=str, default='dist',
+                        help='Diretório de saída do build')
+    parser.add_argument('--widths', type=int, nargs='+', default=list(DEFAULT_WIDTHS),
+                        help='Larguras (px) geradas para o srcset das imagens')
+    args = parser.parse_args()
+
+    if Image is None:
+        print("AVISO: Pillow não instalado; imagens serão copiadas sem otimização", file=sys.stderr)
+
+    try:
+        builder = SiteBuilder(ROOT, ROOT / args.output, tuple(args.widths))
+        builder.build()
+    except ValueError as e:
+        parser.error(str(e))
+    print(builder.report())
+    print(f"Build gerado em {builder.output}")
+
+
+if __name__ == '__main__':
+    main()
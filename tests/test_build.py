@@ -0,0 +1,45 @@
+"""Casos de entrada/saída dos minificadores de build.py."""
+import pytest
+
+from build import minify_css, minify_html, minify_js
+
+
+@pytest.mark.parametrize('source, expected', [
+    # Sem ponto e vírgula a quebra de linha é mantida, para não mudar o ASI
+    ('var a = b\n(function () { go() })()', 'var a=b\n(function(){go()})()\n'),
+    ('var x = a\nvar y = b', 'var x=a\nvar y=b\n'),
+    ('a\n++b', 'a\n++b\n'),
+    # Divisões seguidas não são lidas como expressão regular
+    ('let r = x / y / z;', 'let r=x / y / z;\n'),
+    ('function f(s) {\n  return /ab+c/g.test(s);\n}', 'function f(s){return /ab+c/g.test(s);}\n'),
+    ('var re = /[/]\\//; // fim', 'var re=/[/]\\//;\n'),
+    ('const s = `a ${ `b ${ c } d` } e`;', 'const s=`a ${ `b ${ c } d` } e`;\n'),
+    ('const s = `linha 1\n  // não é comentário`;', 'const s=`linha 1\n  // não é comentário`;\n'),
+    # Sinais repetidos não podem se juntar em -- ou ++
+    ('var a = b - -c; var d = e + +f; var g = h - --i;', 'var a=b - -c;var d=e + +f;var g=h - --i;\n'),
+    ("var s = 'a  //  b'; // comentário\nvar t = 1; /* bloco */", "var s='a  //  b';var t=1;\n"),
+])
+def test_minify_js(source, expected):
+    assert minify_js(source) == expected
+
+
+@pytest.mark.parametrize('source, expected', [
+    ('a { width: calc(100% - 2rem); }', 'a{width:calc(100% - 2rem)}'),
+    ('a { margin: calc( (1px + 2px) * 3 ); }', 'a{margin:calc( (1px + 2px) * 3 )}'),
+    (".a::before { content: 'x  /* y */  z'; }", ".a::before{content:'x  /* y */  z'}"),
+    ('a { font-family: "Open  Sans", sans-serif; }', 'a{font-family:"Open  Sans",sans-serif}'),
+    ("/* don't */\nb { color: red }", 'b{color:red}'),
+    ('@media (min-width: 600px) and (max-width: 900px) {\n  a > b { c: d; }\n}',
+     '@media (min-width:600px) and (max-width:900px){a>b{c:d}}'),
+])
+def test_minify_css(source, expected):
+    assert minify_css(source) == expected
+
+
+@pytest.mark.parametrize('source, expected', [
+    ('<div>\n  <p>a   b</p>\n</div>\n<pre>  x\n    y</pre>', '<div> <p>a b</p> </div> <pre>  x\n    y</pre>'),
+    ('<!-- c --><textarea>  a\n b</textarea>', '<textarea>  a\n b</textarea>'),
+    ('<p>a <b>b</b> c</p>', '<p>a <b>b</b> c</p>'),
+])
+def test_minify_html(source, expected):
+    assert minify_html(source) == expected